@@ -4,16 +4,21 @@ Chatbot using Ollama's Qwen model with basic tool calling support.
 This follows the agentic pattern with simple tool definitions.
 """
 
-import requests
-import json
+import asyncio
+import httpx
+import orjson
 import sys
 import logging
 import os
-from dotenv import load_dotenv
-from tools import execute_tool, get_available_tools
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from prompt_toolkit import PromptSession
+
+import config
+from tools import execute_tool, get_available_tools, get_available_tools_bytes, refresh_log_cache
 
 # Load environment variables from .env file
-load_dotenv()
+config.ensure_loaded()
 
 # Configure logging
 logging.basicConfig(
@@ -22,8 +27,48 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-OLLAMA_URL = "http://localhost:11434/api/chat"
+# tools caches its debug-level check at import, before logging was configured
+refresh_log_cache()
+
+OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_CHAT_PATH = "/api/chat"
+OLLAMA_TAGS_PATH = "/api/tags"
+OLLAMA_GENERATE_PATH = "/api/generate"
 OLLAMA_MODEL = "qwen3:latest"
+OLLAMA_TIMEOUT = 30
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Static head of every /api/chat request body; see _encode_chat_request.
+_CHAT_REQUEST_PREFIX = b'{"model":' + orjson.dumps(OLLAMA_MODEL) + b',"stream":true,"tools":'
+
+# Ollama unloads an idle model after 5 minutes by default and reloading qwen3
+# takes several seconds, so the model is pinged this often while the user types.
+KEEPALIVE_INTERVAL = 240
+
+# Commands that end the chat session
+EXIT_COMMANDS = frozenset(('quit', 'exit', 'bye'))
+
+# Upper bound on the number of tool calls executed concurrently in one turn.
+MAX_CONCURRENT_TOOL_CALLS = 4
+
+# Dedicated worker pool for tool calls. Its size is what bounds concurrency,
+# and tools never compete with other work for the loop's default executor.
+TOOL_EXECUTOR = ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_TOOL_CALLS, thread_name_prefix="tool"
+)
+
+# Shared async HTTP client for Ollama. Connections are kept alive and reused
+# across the agentic loop, and connection failures are retried. The client is
+# only driven from the event loop owned by main(), so pooled connections stay
+# bound to a single loop.
+OLLAMA_CLIENT = httpx.AsyncClient(
+    base_url=OLLAMA_BASE_URL,
+    timeout=OLLAMA_TIMEOUT,
+    transport=httpx.AsyncHTTPTransport(
+        retries=2,
+        limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+    ),
+)
 
 # System prompt configuration
 # The prompt is loaded from a text file at startup (default: system_prompt.txt).
@@ -32,10 +77,80 @@ SYSTEM_PROMPT_PATH = os.getenv("SYSTEM_PROMPT_PATH", "system_prompt.txt")
 SYSTEM_PROMPT: str = ""
 
 
-def process_query(query: str, tools: list):
+def _encode_chat_request(messages: list, tools_json: bytes) -> bytes:
+    """
+    Build the JSON body for an Ollama /api/chat request.
+    The tool schemas do not change during a session, so they are passed in
+    pre-serialized and spliced in; only the messages are encoded per call.
+    """
+    return _CHAT_REQUEST_PREFIX + tools_json + b',"messages":' + orjson.dumps(messages) + b'}'
+
+
+async def _stream_chat(messages: list, tools_json: bytes) -> dict:
+    """
+    Send a streaming /api/chat request and assemble the assistant message.
+    Content tokens are written to stdout as they arrive, so the user sees
+    the answer while it is still being generated. HTTP errors are raised.
+    """
+    content_parts = []
+    tool_calls = []
+    
+    async with OLLAMA_CLIENT.stream(
+        "POST",
+        OLLAMA_CHAT_PATH,
+        content=_encode_chat_request(messages, tools_json),
+        headers=JSON_HEADERS,
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            
+            chunk = orjson.loads(line)
+            if 'error' in chunk:
+                raise RuntimeError(f"Ollama error: {chunk['error']}")
+            
+            delta = chunk.get('message', {})
+            token = delta.get('content', '')
+            if token:
+                if not content_parts:
+                    sys.stdout.write("Qwen: ")
+                content_parts.append(token)
+                sys.stdout.write(token)
+                sys.stdout.flush()
+            tool_calls.extend(delta.get('tool_calls', []))
+            
+            if chunk.get('done'):
+                break
+    
+    if content_parts:
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+    
+    message = {'role': 'assistant', 'content': "".join(content_parts)}
+    if tool_calls:
+        message['tool_calls'] = tool_calls
+    return message
+
+
+async def _run_tool_call(tool_call: dict):
+    """Execute a single tool call on the tool worker pool."""
+    # Intern the name once here so the registry lookup in execute_tool can
+    # match the (already interned) literal keys by identity
+    tool_name = sys.intern(tool_call['function']['name'])
+    tool_args = tool_call['function']['arguments']
+
+    logger.info("Calling tool: %s with args: %s", tool_name, tool_args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(TOOL_EXECUTOR, execute_tool, tool_name, tool_args)
+
+
+async def process_query(query: str, tools_json: bytes):
     """
     Process a user query using Ollama Qwen with tool support.
     Implements the agentic loop pattern that handles tool_use blocks.
+    Independent tool calls from the same turn are executed concurrently.
+    tools_json is the JSON-encoded list of tool definitions.
     """
     # Build messages array with system prompt if configured
     messages = []
@@ -45,45 +160,34 @@ def process_query(query: str, tools: list):
     
     messages.append({'role': 'user', 'content': query})
     
-    payload = {
-        "model": OLLAMA_MODEL,
-        "messages": messages,
-        "tools": tools,
-        "stream": False
-    }
-    
     try:
-        logger.debug(f"Sending request to Ollama: {OLLAMA_URL}")
-        response = requests.post(OLLAMA_URL, json=payload, timeout=30)
+        logger.debug("Sending request to Ollama: %s%s", OLLAMA_BASE_URL, OLLAMA_CHAT_PATH)
+        message = await _stream_chat(messages, tools_json)
+        logger.debug("Received response: %s", message)
         
+    except httpx.TimeoutException:
+        logger.error("Request to Ollama timed out. Ollama may be processing a large request.")
+        return
+    except httpx.ConnectError:
+        logger.error("Could not connect to Ollama. Make sure it's running.")
+        return
+    except httpx.HTTPStatusError as e:
         # Check for specific error codes
-        if response.status_code == 404:
-            logger.error(f"Ollama endpoint not found. The model '{OLLAMA_MODEL}' may not support tool calling.")
+        if e.response.status_code == 404:
+            logger.error("Ollama endpoint not found. The model '%s' may not support tool calling.", OLLAMA_MODEL)
             logger.error("The /api/chat endpoint returned 404. This could mean:")
             logger.error("1. Your Ollama version is too old (need 0.1.26+)")
             logger.error("2. The model doesn't support tool/function calling")
-            logger.error(f"Model: {OLLAMA_MODEL}, Endpoint: {OLLAMA_URL}")
+            logger.error("Model: %s, Endpoint: %s%s", OLLAMA_MODEL, OLLAMA_BASE_URL, OLLAMA_CHAT_PATH)
             logger.error("Possible solutions:")
             logger.error("1. Update Ollama: brew upgrade ollama (or download latest from ollama.ai)")
             logger.error("2. Try a model that supports tools: ollama pull qwen2.5:latest")
             logger.error("3. Check Ollama version: ollama --version (need 0.1.26+)")
-            return
-        
-        response.raise_for_status()
-        response_data = response.json()
-        logger.debug(f"Received response: {response_data}")
-        
-    except requests.exceptions.Timeout:
-        logger.error("Request to Ollama timed out. Ollama may be processing a large request.")
-        return
-    except requests.exceptions.ConnectionError:
-        logger.error("Could not connect to Ollama. Make sure it's running.")
-        return
-    except requests.exceptions.HTTPError as e:
-        logger.error(f"HTTP error from Ollama: {e}")
+        else:
+            logger.error("HTTP error from Ollama: %s", e)
         return
     except Exception as e:
-        logger.error(f"Unexpected error: {e}", exc_info=True)
+        logger.error("Unexpected error: %s", e, exc_info=True)
         return
     
     process_query_flag = True
@@ -92,59 +196,53 @@ def process_query(query: str, tools: list):
     
     while process_query_flag and iteration < max_iterations:
         iteration += 1
-        logger.debug(f"Processing iteration {iteration}")
+        logger.debug("Processing iteration %d", iteration)
         
-        message = response_data.get('message', {})
         content = message.get('content', '')
         tool_calls = message.get('tool_calls', [])
         
-        # If there's text content, log it
+        # Text content has already been streamed to stdout; keep it in the log
         if content:
-            logger.info(f"LLM Response: {content}")
+            logger.debug("LLM Response: %s", content)
         
         # Check if there are tool calls
         if tool_calls:
-            logger.info(f"Processing {len(tool_calls)} tool call(s)")
+            logger.info("Processing %d tool call(s)", len(tool_calls))
             # Add assistant message with tool calls to history
             messages.append(message)
             
-            # Process each tool call
-            for tool_call in tool_calls:
-                try:
-                    tool_name = tool_call['function']['name']
-                    tool_args = tool_call['function']['arguments']
-                    
-                    logger.info(f"Calling tool: {tool_name} with args: {tool_args}")
-                    
-                    # Call the tool
-                    result = execute_tool(tool_name, tool_args)
-                    logger.debug(f"Tool result: {result}")
-                    
-                    # Add tool result to messages
-                    messages.append({
-                        "role": "tool",
-                        "content": str(result)
-                    })
-                except KeyError as e:
-                    logger.error(f"Malformed tool call: {e}")
-                    continue
-                except Exception as e:
-                    logger.error(f"Error executing tool: {e}", exc_info=True)
+            # Submit every tool call before waiting on any of them, so the
+            # stage takes as long as the slowest call rather than the sum.
+            # gather() returns results in the original call order.
+            results = await asyncio.gather(
+                *(_run_tool_call(tool_call) for tool_call in tool_calls),
+                return_exceptions=True,
+            )
+            
+            for result in results:
+                if isinstance(result, KeyError):
+                    logger.error("Malformed tool call: %s", result)
                     continue
+                if isinstance(result, BaseException):
+                    # execute_tool only handles expected tool errors; anything
+                    # else ends up here. Log it once with its traceback and
+                    # still tell the model the call failed.
+                    logger.error("Error executing tool: %s", result, exc_info=result)
+                    result = {"error": f"Error executing tool: {result}"}
+                
+                logger.debug("Tool result: %s", result)
+                
+                # Add tool result to messages
+                messages.append({
+                    "role": "tool",
+                    "content": str(result)
+                })
             
             # Get next response from Ollama
             try:
-                payload = {
-                    "model": OLLAMA_MODEL,
-                    "messages": messages,
-                    "tools": tools,
-                    "stream": False
-                }
-                response = requests.post(OLLAMA_URL, json=payload, timeout=30)
-                response.raise_for_status()
-                response_data = response.json()
+                message = await _stream_chat(messages, tools_json)
             except Exception as e:
-                logger.error(f"Error getting follow-up response: {e}")
+                logger.error("Error getting follow-up response: %s", e)
                 break
         else:
             # No more tool calls, we're done
@@ -155,41 +253,70 @@ def process_query(query: str, tools: list):
         logger.warning("Max iterations reached, stopping to prevent infinite loop")
 
 
-def chat_with_qwen(tools):
+async def _keep_model_loaded() -> None:
+    """
+    Periodically ask Ollama to keep the chat model in memory.
+    A generate request without a prompt loads the model and resets its
+    idle timer without producing any output. keep_alive is left to the
+    server (OLLAMA_KEEP_ALIVE, 5 minutes by default), which
+    KEEPALIVE_INTERVAL stays under.
+    """
+    payload = orjson.dumps({"model": OLLAMA_MODEL, "stream": False})
+    while True:
+        await asyncio.sleep(KEEPALIVE_INTERVAL)
+        try:
+            response = await OLLAMA_CLIENT.post(
+                OLLAMA_GENERATE_PATH, content=payload, headers=JSON_HEADERS
+            )
+            response.raise_for_status()
+            logger.debug("Sent keep-alive for model %s", OLLAMA_MODEL)
+        except httpx.HTTPError as e:
+            logger.debug("Keep-alive request to Ollama failed: %s", e)
+
+
+async def chat_with_qwen(tools_json: bytes):
     """
     Main chatbot loop using Ollama Qwen with basic tools.
     Type 'quit', 'exit', or 'bye' to end the conversation.
+    User input is read asynchronously, so the model keep-alive task keeps
+    running while the user is typing. tools_json is the JSON-encoded list
+    of tool definitions.
     """
     logger.info("=" * 60)
     logger.info("Qwen Chatbot - Powered by Ollama with Tools")
     logger.info("=" * 60)
     logger.info("Type 'quit', 'exit', or 'bye' to end the conversation.")
     
-    while True:
-        try:
-            # Get user input
-            user_input = input("You: ").strip()
-            
-            # Check for exit commands
-            if user_input.lower() in ['quit', 'exit', 'bye']:
-                logger.info("User initiated exit")
-                logger.info("Goodbye! Thanks for chatting!")
+    session = PromptSession()
+    keepalive = asyncio.create_task(_keep_model_loaded())
+    try:
+        while True:
+            try:
+                # Get user input
+                user_input = (await session.prompt_async("You: ")).strip()
+                
+                # Check for exit commands
+                if user_input.lower() in EXIT_COMMANDS:
+                    logger.info("User initiated exit")
+                    logger.info("Goodbye! Thanks for chatting!")
+                    break
+                
+                if not user_input:
+                    continue
+                
+                logger.info("User query: %s", user_input)
+                logger.info("Qwen: Processing query...")
+                await process_query(user_input, tools_json)
+                logger.debug("Query processing completed")
+                
+            except (KeyboardInterrupt, EOFError):
+                logger.info("Interrupted by user")
+                logger.info("Interrupted. Goodbye!")
                 break
-            
-            if not user_input:
-                continue
-            
-            logger.info(f"User query: {user_input}")
-            logger.info("Qwen: Processing query...")
-            process_query(user_input, tools)
-            logger.debug("Query processing completed")
-            
-        except KeyboardInterrupt:
-            logger.info("Interrupted by user")
-            logger.info("Interrupted. Goodbye!")
-            break
-        except Exception as e:
-            logger.error(f"Unexpected error in chat loop: {e}", exc_info=True)
+            except Exception as e:
+                logger.error("Unexpected error in chat loop: %s", e, exc_info=True)
+    finally:
+        keepalive.cancel()
 
 
 def log_api_key_status() -> None:
@@ -208,8 +335,8 @@ def load_system_prompt_from_file() -> None:
     """Load the system prompt from the configured file into the global variable."""
     global SYSTEM_PROMPT
     try:
-        with open(SYSTEM_PROMPT_PATH, "r", encoding="utf-8") as f:
-            SYSTEM_PROMPT = f.read().strip()
+        # Strip the raw bytes before decoding to avoid an extra str copy
+        SYSTEM_PROMPT = Path(SYSTEM_PROMPT_PATH).read_bytes().strip().decode("utf-8")
         if SYSTEM_PROMPT:
             logger.info(
                 "System prompt loaded from '%s' (%d characters)",
@@ -235,30 +362,31 @@ def load_system_prompt_from_file() -> None:
         )
 
 
-def ensure_ollama_available() -> None:
+async def ensure_ollama_available() -> None:
     """Verify Ollama is reachable and the desired model is available."""
     try:
         logger.debug("Checking Ollama connection...")
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
+        response = await OLLAMA_CLIENT.get(OLLAMA_TAGS_PATH, timeout=5)
         response.raise_for_status()
-        models_data = response.json()
+        models_data = orjson.loads(response.content)
         models = models_data.get("models", [])
 
         logger.info("Connected to Ollama. Found %d model(s)", len(models))
 
-        model_names = [m.get("name", "") for m in models]
-        logger.debug("Available models: %s", model_names)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Available models: %s", [m.get("name", "") for m in models])
 
-        if not any("qwen" in name.lower() for name in model_names):
+        has_qwen = any("qwen" in (m.get("name") or "").casefold() for m in models)
+        if not has_qwen:
             logger.warning("No Qwen model found in Ollama.")
             logger.warning("You can install one with: ollama pull qwen3:latest")
         else:
             logger.info("Qwen model is available in Ollama")
 
-    except requests.exceptions.ConnectionError:
-        logger.error("Cannot connect to Ollama at http://localhost:11434")
+    except httpx.ConnectError:
+        logger.error("Cannot connect to Ollama at %s", OLLAMA_BASE_URL)
         raise
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.error("Timeout connecting to Ollama")
         raise
     except Exception as e:
@@ -266,12 +394,12 @@ def ensure_ollama_available() -> None:
         raise
 
 
-def initialize_tools():
-    """Load and return the available tools."""
+def initialize_tools() -> bytes:
+    """Load the available tools and return their pre-encoded JSON definitions."""
     try:
         tools = get_available_tools()
         logger.info("Loaded %d tool(s)", len(tools))
-        return tools
+        return get_available_tools_bytes()
     except Exception as e:
         logger.error("Error loading tools: %s", e, exc_info=True)
         raise
@@ -284,15 +412,27 @@ def main() -> None:
     # Startup checks and configuration
     log_api_key_status()
     load_system_prompt_from_file()
-    ensure_ollama_available()
 
-    # Initialize tools and start chat loop
-    tools = initialize_tools()
-    try:
-        chat_with_qwen(tools)
-    except Exception as e:
-        logger.critical("Fatal error in chat loop: %s", e, exc_info=True)
-        raise
+    # One event loop for the whole session keeps the Ollama client's pooled
+    # connections usable from startup check to the last query.
+    with asyncio.Runner() as runner:
+        try:
+            runner.run(ensure_ollama_available())
+
+            # Initialize tools and start chat loop
+            tools_json = initialize_tools()
+            try:
+                runner.run(chat_with_qwen(tools_json))
+            except KeyboardInterrupt:
+                # Ctrl+C while a query is being processed cancels the loop
+                logger.info("Interrupted by user")
+                logger.info("Interrupted. Goodbye!")
+            except Exception as e:
+                logger.critical("Fatal error in chat loop: %s", e, exc_info=True)
+                raise
+        finally:
+            runner.run(OLLAMA_CLIENT.aclose())
+            TOOL_EXECUTOR.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Shared configuration loading for the chatbot modules.
+Environment variables are read from the .env file only once per process,
+no matter how many modules ask for them.
+"""
+
+from dotenv import load_dotenv
+
+_LOADED = False
+
+
+def ensure_loaded() -> None:
+    """Load environment variables from the .env file if not already done."""
+    global _LOADED
+    if not _LOADED:
+        load_dotenv()
+        _LOADED = True
@@ -1,9 +1,13 @@
 import os
+import sys
 from memori import Memori
 from openai import OpenAI
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+# Commands that end the chat session
+EXIT_COMMANDS = frozenset(('quit', 'exit', 'bye'))
+
 # Setup Ollama with OpenAI-compatible client
 client = OpenAI(
     base_url="http://localhost:11434/v1",
@@ -20,12 +24,22 @@ mem.attribution(entity_id="sarang", process_id="chatbot-v1")
 mem.config.storage.build()
 
 def chat(user_message):
-    """Send a message and get a response"""
-    response = client.chat.completions.create(
+    """Send a message, stream the response to stdout and return it"""
+    stream = client.chat.completions.create(
         model="qwen3:latest",
         messages=[{"role": "user", "content": user_message}],
+        stream=True,
     )
-    return response.choices[0].message.content
+    parts = []
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        token = chunk.choices[0].delta.content or ""
+        if token:
+            parts.append(token)
+            sys.stdout.write(token)
+            sys.stdout.flush()
+    return "".join(parts)
 
 def main():
     print("🤖 Chatbot with Memory (powered by Qwen3:8b)")
@@ -35,15 +49,16 @@ def main():
     while True:
         user_input = input("You: ").strip()
         
-        if user_input.lower() in ['quit', 'exit', 'bye']:
+        if user_input.lower() in EXIT_COMMANDS:
             print("👋 Goodbye!")
             break
         
         if not user_input:
             continue
         
-        response = chat(user_input)
-        print(f"Bot: {response}\n")
+        print("Bot: ", end="", flush=True)
+        chat(user_input)
+        print("\n")
 
 if __name__ == "__main__":
     main()
@@ -1,21 +1,25 @@
 #!/usr/bin/env python3
 """
 Diagnostic script to test Ollama setup and tool calling support.
+The chat and tool calling checks are independent, so they run concurrently.
 """
 
-import requests
-import json
+import asyncio
+import httpx
+import orjson
 
-def test_ollama_connection():
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+async def test_ollama_connection(client):
     """Test basic Ollama connection"""
     print("=" * 60)
     print("Testing Ollama Connection")
     print("=" * 60)
     
     try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
+        response = await client.get("http://localhost:11434/api/tags", timeout=5)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         models = data.get('models', [])
         
         print(f"✓ Connected to Ollama")
@@ -28,11 +32,14 @@ def test_ollama_connection():
         return False
 
 
-def test_chat_endpoint():
-    """Test /api/chat endpoint"""
-    print("\n" + "=" * 60)
-    print("Testing /api/chat endpoint")
-    print("=" * 60)
+async def test_chat_endpoint(client, out):
+    """
+    Test /api/chat endpoint.
+    Output is collected in out so concurrent checks do not interleave.
+    """
+    out.append("\n" + "=" * 60)
+    out.append("Testing /api/chat endpoint")
+    out.append("=" * 60)
     
     payload = {
         "model": "qwen2.5:latest",
@@ -41,28 +48,35 @@ def test_chat_endpoint():
     }
     
     try:
-        response = requests.post("http://localhost:11434/api/chat", json=payload, timeout=10)
-        print(f"Status Code: {response.status_code}")
+        response = await client.post(
+            "http://localhost:11434/api/chat",
+            content=orjson.dumps(payload),
+            headers=JSON_HEADERS,
+        )
+        out.append(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
-            print("✓ /api/chat endpoint works")
-            data = response.json()
-            print(f"Response: {data.get('message', {}).get('content', 'No content')[:100]}")
+            out.append("✓ /api/chat endpoint works")
+            data = orjson.loads(response.content)
+            out.append(f"Response: {data.get('message', {}).get('content', 'No content')[:100]}")
             return True
         else:
-            print(f"✗ /api/chat returned {response.status_code}")
-            print(f"Response: {response.text[:200]}")
+            out.append(f"✗ /api/chat returned {response.status_code}")
+            out.append(f"Response: {response.text[:200]}")
             return False
     except Exception as e:
-        print(f"✗ Failed: {e}")
+        out.append(f"✗ Failed: {e}")
         return False
 
 
-def test_tool_calling():
-    """Test tool calling support"""
-    print("\n" + "=" * 60)
-    print("Testing Tool Calling Support")
-    print("=" * 60)
+async def test_tool_calling(client, out):
+    """
+    Test tool calling support.
+    Output is collected in out so concurrent checks do not interleave.
+    """
+    out.append("\n" + "=" * 60)
+    out.append("Testing Tool Calling Support")
+    out.append("=" * 60)
     
     tools = [
         {
@@ -92,48 +106,60 @@ def test_tool_calling():
     }
     
     try:
-        response = requests.post("http://localhost:11434/api/chat", json=payload, timeout=10)
-        print(f"Status Code: {response.status_code}")
+        response = await client.post(
+            "http://localhost:11434/api/chat",
+            content=orjson.dumps(payload),
+            headers=JSON_HEADERS,
+        )
+        out.append(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
-            print("✓ Tool calling endpoint works")
-            data = response.json()
+            out.append("✓ Tool calling endpoint works")
+            data = orjson.loads(response.content)
             message = data.get('message', {})
             tool_calls = message.get('tool_calls', [])
             
             if tool_calls:
-                print(f"✓ Model supports tool calling! Found {len(tool_calls)} tool call(s)")
+                out.append(f"✓ Model supports tool calling! Found {len(tool_calls)} tool call(s)")
                 for tc in tool_calls:
-                    print(f"  Tool: {tc.get('function', {}).get('name', 'unknown')}")
+                    out.append(f"  Tool: {tc.get('function', {}).get('name', 'unknown')}")
             else:
-                print("⚠️  Model responded but didn't use tools")
-                print(f"  Response: {message.get('content', 'No content')[:100]}")
+                out.append("⚠️  Model responded but didn't use tools")
+                out.append(f"  Response: {message.get('content', 'No content')[:100]}")
             return True
         elif response.status_code == 404:
-            print("✗ 404 Error: Tool calling not supported")
-            print("\nThis means:")
-            print("  1. Your Ollama version is too old (need 0.1.26+)")
-            print("  2. Or the endpoint doesn't exist")
-            print("\nTo fix:")
-            print("  - Update Ollama: brew upgrade ollama")
-            print("  - Or download from: https://ollama.ai")
+            out.append("✗ 404 Error: Tool calling not supported")
+            out.append("\nThis means:")
+            out.append("  1. Your Ollama version is too old (need 0.1.26+)")
+            out.append("  2. Or the endpoint doesn't exist")
+            out.append("\nTo fix:")
+            out.append("  - Update Ollama: brew upgrade ollama")
+            out.append("  - Or download from: https://ollama.ai")
             return False
         else:
-            print(f"✗ Unexpected status code: {response.status_code}")
-            print(f"Response: {response.text[:200]}")
+            out.append(f"✗ Unexpected status code: {response.status_code}")
+            out.append(f"Response: {response.text[:200]}")
             return False
     except Exception as e:
-        print(f"✗ Failed: {e}")
+        out.append(f"✗ Failed: {e}")
         return False
 
 
-def main():
+async def main():
     print("\n🔍 Ollama Diagnostic Tool\n")
     
     results = []
-    results.append(("Connection", test_ollama_connection()))
-    results.append(("Chat Endpoint", test_chat_endpoint()))
-    results.append(("Tool Calling", test_tool_calling()))
+    async with httpx.AsyncClient(timeout=10) as client:
+        results.append(("Connection", await test_ollama_connection(client)))
+        
+        chat_out, tool_out = [], []
+        chat_ok, tool_ok = await asyncio.gather(
+            test_chat_endpoint(client, chat_out),
+            test_tool_calling(client, tool_out),
+        )
+        print("\n".join(chat_out + tool_out))
+        results.append(("Chat Endpoint", chat_ok))
+        results.append(("Tool Calling", tool_ok))
     
     print("\n" + "=" * 60)
     print("Summary")
@@ -149,5 +175,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
 
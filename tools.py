@@ -8,14 +8,26 @@ API Usage:
 - search_stock_symbol: Uses Yahoo Finance search API (primary) with Alpha Vantage fallback
 """
 
+import ast
 import logging
+import math
+import operator
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from functools import lru_cache
+from types import MappingProxyType
+import orjson
 import requests
 import yfinance as yf
-from dotenv import load_dotenv
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config
 
 # Load environment variables from .env file
-load_dotenv()
+config.ensure_loaded()
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +37,113 @@ if ALPHAVANTAGE_API_KEY:
 else:
     logger.warning("ALPHAVANTAGE_API_KEY not found in environment variables")
 
+# Shared HTTP session so connections to Yahoo Finance and Alpha Vantage are
+# kept alive across tool calls. Connection failures and transient gateway
+# errors are retried; read timeouts are not, so a hung endpoint costs one
+# timeout. 429s are not retried either, so rate limiting still triggers the
+# Alpha Vantage fallback.
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(
+            total=2,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_status=False,
+            raise_on_status=False,
+        ),
+    ),
+)
+
+# In-process TTL caches for successful tool results, so repeated questions
+# about the same ticker or company within a session skip the network.
+# Tools run in worker threads and TTLCache is not thread-safe, hence the lock.
+_STOCK_PRICE_CACHE = TTLCache(maxsize=256, ttl=60)
+_SYMBOL_SEARCH_CACHE = TTLCache(maxsize=256, ttl=3600)
+_WEATHER_CACHE = TTLCache(maxsize=256, ttl=600)
+_CACHE_LOCK = threading.Lock()
+
+# Company names rarely change, so they are kept for the whole session once
+# looked up; only the first price lookup for a symbol needs the full quote.
+_COMPANY_NAMES = {}
+
+# Alpha Vantage's free tier only allows a few requests per day, so rather than
+# querying both providers every time it is used as a hedge: it is only started
+# if Yahoo Finance fails or has not answered within this many seconds.
+_SEARCH_HEDGE_DELAY = 2.0
+_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="symbol-search")
+
+_YF_SEARCH_URL = "https://query2.finance.yahoo.com/v1/finance/search"
+_YF_SEARCH_PARAMS = {
+    "quotesCount": 5,
+    "newsCount": 0,
+    "quotesQueryId": "tss_match_phrase_query",
+}
+_AV_URL = "https://www.alphavantage.co/query"
+
+# Arithmetic operators accepted by calculate(); anything else is rejected
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+# Limits that keep expressions like 9 ** 9 ** 9 or ((9 ** 1000) ** 1000) ** 1000
+# from tying up a worker thread: the exponent itself, and the estimated size
+# of integer powers and products, which is checked before computing them
+_MAX_EXPONENT = 1000
+_MAX_RESULT_BITS = 100_000
+# Deeply nested input such as "-" * 10000 + "1" exhausts the parser
+_MAX_EXPRESSION_LENGTH = 1000
+
+
+def _cache_get(cache: TTLCache, key):
+    """Return the cached value for key, or None if missing or expired."""
+    with _CACHE_LOCK:
+        return cache.get(key)
+
+
+def _cache_set(cache: TTLCache, key, value) -> None:
+    """Store value under key in the given cache."""
+    with _CACHE_LOCK:
+        cache[key] = value
+
+
+def _fast_info_value(fast_info, field: str):
+    """Read a yfinance fast_info field, treating missing data as None."""
+    try:
+        value = getattr(fast_info, field)
+    except (KeyError, TypeError, ValueError):
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _get_company_name(ticker, symbol: str) -> str:
+    """Return the company's long name, falling back to the symbol itself."""
+    company_name = _COMPANY_NAMES.get(symbol)
+    if company_name is None:
+        try:
+            company_name = ticker.info.get('longName', symbol)
+        except Exception as e:
+            logger.debug("Could not fetch company name for %s: %s", symbol, e)
+            return symbol
+        _COMPANY_NAMES[symbol] = company_name
+    return company_name
+
 
 # ============================================================================
 # TOOL IMPLEMENTATIONS
@@ -40,14 +159,65 @@ def get_current_weather(location: str) -> str:
     Returns:
         Weather information as a string
     """
+    cached = _cache_get(_WEATHER_CACHE, location)
+    if cached is not None:
+        logger.debug("Returning cached weather for %s", location)
+        return cached
+    
     # TODO: Replace with actual weather API call
     # Example: OpenWeatherMap, WeatherAPI, etc.
-    return f"The weather in {location} is sunny and 72°F"
+    result = f"The weather in {location} is sunny and 72°F"
+    _cache_set(_WEATHER_CACHE, location, result)
+    return result
+
+
+def _evaluate_node(node):
+    """Recursively evaluate a parsed arithmetic expression node."""
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return node.value
+        raise ValueError(f"unsupported constant: {node.value!r}")
+    
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        left = _evaluate_node(node.left)
+        right = _evaluate_node(node.right)
+        if isinstance(node.op, ast.Pow):
+            if abs(right) > _MAX_EXPONENT:
+                raise ValueError(f"exponent too large: {right}")
+            if isinstance(left, int) and isinstance(right, int) and abs(left).bit_length() * right > _MAX_RESULT_BITS:
+                raise ValueError("result too large")
+        elif isinstance(node.op, ast.Mult):
+            if isinstance(left, int) and isinstance(right, int) and left.bit_length() + right.bit_length() > _MAX_RESULT_BITS:
+                raise ValueError("result too large")
+        result = _BINARY_OPERATORS[type(node.op)](left, right)
+        # A negative number raised to a fractional power gives a complex number
+        if isinstance(result, complex):
+            raise ValueError("complex results are not supported")
+        return result
+    
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_evaluate_node(node.operand))
+    
+    raise ValueError(f"unsupported expression element: {type(node).__name__}")
+
+
+@lru_cache(maxsize=256)
+def _evaluate_expression(expression: str):
+    """
+    Parse and evaluate an arithmetic expression.
+    Evaluation is pure, so results are memoized per expression string.
+    """
+    expression = expression.strip()
+    if len(expression) > _MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"expression longer than {_MAX_EXPRESSION_LENGTH} characters")
+    tree = ast.parse(expression, mode="eval")
+    return _evaluate_node(tree.body)
 
 
 def calculate(expression: str) -> str:
     """
     Perform a mathematical calculation.
+    Only numbers and the arithmetic operators + - * / // % ** are allowed.
     
     Args:
         expression: The mathematical expression to evaluate
@@ -56,9 +226,9 @@ def calculate(expression: str) -> str:
         The result of the calculation
     """
     try:
-        result = eval(expression)
+        result = _evaluate_expression(expression)
         return f"The result is: {result}"
-    except Exception as e:
+    except (SyntaxError, ValueError, TypeError, ArithmeticError, RecursionError) as e:
         return f"Error calculating: {e}"
 
 
@@ -73,125 +243,200 @@ def get_stock_price(symbol: str) -> str:
     Returns:
         Stock price information as a string
     """
+    cached = _cache_get(_STOCK_PRICE_CACHE, symbol)
+    if cached is not None:
+        logger.debug("Returning cached stock data for %s", symbol)
+        return cached
+    
     try:
-        logger.info(f"Fetching stock data for {symbol} using Yahoo Finance API (via yfinance)")
+        logger.info("Fetching stock data for %s using Yahoo Finance API (via yfinance)", symbol)
         ticker = yf.Ticker(symbol)
         
-        # Get current price and basic info
-        logger.debug(f"Calling Yahoo Finance API for ticker: {symbol}")
-        info = ticker.info
+        # Get current price and basic info from the lightweight fast_info
+        # endpoint instead of the full quote summary behind ticker.info
+        logger.debug("Calling Yahoo Finance API for ticker: %s", symbol)
+        fast_info = ticker.fast_info
         
         # Try to get the current price from different fields
-        current_price = info.get('currentPrice') or info.get('regularMarketPrice') or info.get('previousClose')
+        current_price = _fast_info_value(fast_info, 'last_price') or _fast_info_value(fast_info, 'previous_close')
         
         if current_price is None:
-            logger.warning(f"Could not find price for {symbol}")
+            logger.warning("Could not find price for %s", symbol)
             return f"Could not find stock price for symbol '{symbol}'. Please check if the ticker symbol is correct."
         
         # Get additional info
-        company_name = info.get('longName', symbol)
-        currency = info.get('currency', 'USD')
-        market_cap = info.get('marketCap')
-        day_high = info.get('dayHigh')
-        day_low = info.get('dayLow')
+        company_name = _get_company_name(ticker, symbol)
+        currency = _fast_info_value(fast_info, 'currency') or 'USD'
+        market_cap = _fast_info_value(fast_info, 'market_cap')
+        day_high = _fast_info_value(fast_info, 'day_high')
+        day_low = _fast_info_value(fast_info, 'day_low')
         
         # Format the response
-        response = f"{company_name} ({symbol})\n"
-        response += f"Current Price: {currency} {current_price:.2f}\n"
+        parts = [
+            f"{company_name} ({symbol})",
+            f"Current Price: {currency} {current_price:.2f}",
+        ]
         
         if day_high and day_low:
-            response += f"Day Range: {day_low:.2f} - {day_high:.2f}\n"
+            parts.append(f"Day Range: {day_low:.2f} - {day_high:.2f}")
         
         if market_cap:
             # Format market cap in billions or millions
             if market_cap >= 1e9:
-                response += f"Market Cap: ${market_cap/1e9:.2f}B"
+                parts.append(f"Market Cap: ${market_cap/1e9:.2f}B")
             else:
-                response += f"Market Cap: ${market_cap/1e6:.2f}M"
+                parts.append(f"Market Cap: ${market_cap/1e6:.2f}M")
         
-        logger.info(f"Successfully retrieved stock data for {symbol} from Yahoo Finance API")
+        response = "\n".join(parts)
+        
+        logger.info("Successfully retrieved stock data for %s from Yahoo Finance API", symbol)
+        _cache_set(_STOCK_PRICE_CACHE, symbol, response)
         return response
         
     except Exception as e:
-        logger.error(f"Error fetching stock data for {symbol} from Yahoo Finance API: {e}", exc_info=True)
+        logger.error("Error fetching stock data for %s from Yahoo Finance API: %s", symbol, e, exc_info=True)
         return f"Error fetching stock data for '{symbol}': {str(e)}"
 
 
+def _search_yahoo(company_name: str) -> list:
+    """
+    Search the Yahoo Finance search API for ticker symbols.
+    
+    Returns:
+        Formatted match lines, empty if no result had a usable symbol.
+        Request and HTTP errors are raised to the caller.
+    """
+    logger.info("Searching Yahoo Finance for ticker symbol, query='%s'", company_name)
+
+    params = {**_YF_SEARCH_PARAMS, "q": company_name}
+    resp = _HTTP_SESSION.get(_YF_SEARCH_URL, params=params, timeout=10)
+    if resp.status_code == 429:
+        logger.warning("Rate limited by Yahoo Finance")
+    resp.raise_for_status()
+
+    data = orjson.loads(resp.content)
+    logger.debug("Yahoo Finance raw search result: %s", data)
+
+    lines = []
+    for quote in data.get("quotes", [])[:5]:
+        symbol = quote.get("symbol")
+        shortname = quote.get("shortname") or quote.get("longname") or symbol
+        exchange = quote.get("exchange") or quote.get("fullExchangeName") or "N/A"
+        quote_type = quote.get("quoteType") or "N/A"
+
+        if not symbol:
+            continue
+
+        lines.append(
+            f"{shortname} — {symbol} (Symbol: {symbol}, Exchange: {exchange}, Type: {quote_type})"
+        )
+
+    if not lines:
+        logger.info("Yahoo Finance returned no usable results for '%s'", company_name)
+    return lines
+
+
+def _search_alpha_vantage(company_name: str):
+    """
+    Search Alpha Vantage SYMBOL_SEARCH for ticker symbols.
+    
+    Returns:
+        Formatted match lines, an empty list if there were matches but none
+        had a usable symbol, or None if there were no matches at all.
+        Request and HTTP errors are raised to the caller.
+    """
+    logger.info(
+        "Searching Alpha Vantage for ticker symbol, query='%s'",
+        company_name,
+    )
+    params = {
+        "function": "SYMBOL_SEARCH",
+        "keywords": company_name,
+        "apikey": ALPHAVANTAGE_API_KEY,
+    }
+    resp = _HTTP_SESSION.get(_AV_URL, params=params, timeout=10)
+    resp.raise_for_status()
+    data = orjson.loads(resp.content)
+    logger.debug("Alpha Vantage raw search result: %s", data)
+
+    matches = data.get("bestMatches", [])
+    if not matches:
+        logger.warning("Alpha Vantage returned no matches for '%s'", company_name)
+        return None
+
+    lines = []
+    for m in matches[:5]:
+        symbol = m.get("1. symbol")
+        name = m.get("2. name") or symbol
+        region = m.get("4. region") or "N/A"
+        currency = m.get("8. currency") or "N/A"
+        if not symbol:
+            continue
+        lines.append(
+            f"{name} — {symbol} (Symbol: {symbol}, Region: {region}, Currency: {currency})"
+        )
+
+    if not lines:
+        logger.warning(
+            "Alpha Vantage results for '%s' contained no usable symbols",
+            company_name,
+        )
+    return lines
+
+
+def _run_search(source: str, search, company_name: str):
+    """
+    Run one provider's symbol search, logging failures.
+    
+    Returns:
+        Whatever the search returned, or the exception it raised
+    """
+    try:
+        return search(company_name)
+    except requests.exceptions.HTTPError as e:
+        logger.warning("%s search HTTP error for '%s': %s", source, company_name, e)
+        return e
+    except Exception as e:
+        logger.error("Error calling %s search: %s", source, e, exc_info=True)
+        return e
+
+
 def search_stock_symbol(company_name: str) -> str:
     """
     Search for stock ticker symbol(s) by company name.
     Primary source: Yahoo Finance search API.
     Fallback source: Alpha Vantage SYMBOL_SEARCH (requires ALPHAVANTAGE_API_KEY).
+    
+    Alpha Vantage is started as a hedge if Yahoo fails or has not answered
+    within _SEARCH_HEDGE_DELAY seconds; the first usable result wins.
     """
 
-    def _format_lines(lines, source_label: str) -> str:
-        header = f"Top matches for '{company_name}' ({source_label}):\n"
-        return header + "\n".join(lines)
-
-    # -----------------------------
-    # Primary: Yahoo Finance search
-    # -----------------------------
-    try:
-        logger.info(f"Searching Yahoo Finance for ticker symbol, query='{company_name}'")
-
-        url = "https://query2.finance.yahoo.com/v1/finance/search"
-        params = {
-            "q": company_name,
-            "quotesCount": 5,
-            "newsCount": 0,
-            "quotesQueryId": "tss_match_phrase_query",
-        }
-
-        resp = requests.get(url, params=params, timeout=10)
-        try:
-            resp.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            # If rate-limited or other HTTP error, log and fall back
-            status = resp.status_code
-            logger.warning(f"Yahoo Finance search HTTP {status} for '{company_name}': {e}")
-            if status == 429:
-                logger.warning("Rate limited by Yahoo Finance, will try Alpha Vantage fallback")
-            else:
-                logger.warning("Yahoo Finance search failed, will try Alpha Vantage fallback")
-        else:
-            data = resp.json()
-            logger.debug(f"Yahoo Finance raw search result: {data}")
-
-            quotes = data.get("quotes", [])
-
-            if quotes:
-                lines = []
-                for quote in quotes[:5]:
-                    symbol = quote.get("symbol")
-                    shortname = quote.get("shortname") or quote.get("longname") or symbol
-                    exchange = quote.get("exchange") or quote.get("fullExchangeName") or "N/A"
-                    quote_type = quote.get("quoteType") or "N/A"
-
-                    if not symbol:
-                        continue
-
-                    lines.append(
-                        f"{shortname} — {symbol} (Symbol: {symbol}, Exchange: {exchange}, Type: {quote_type})"
-                    )
-
-                if lines:
-                    logger.info(
-                        f"Found {len(lines)} ticker match(es) for '{company_name}' via Yahoo Finance"
-                    )
-                    return _format_lines(lines, "Yahoo Finance")
-
-            logger.info(
-                f"Yahoo Finance returned no usable results for '{company_name}', trying Alpha Vantage"
-            )
+    cache_key = company_name.lower()
+    cached = _cache_get(_SYMBOL_SEARCH_CACHE, cache_key)
+    if cached is not None:
+        logger.debug("Returning cached ticker matches for '%s'", company_name)
+        return cached
 
-    except Exception as e:
-        logger.error(f"Error calling Yahoo Finance search: {e}", exc_info=True)
-        # Fall through to Alpha Vantage fallback
+    def _found(lines, source_label: str) -> str:
+        logger.info(
+            "Found %d ticker match(es) for '%s' via %s",
+            len(lines),
+            company_name,
+            source_label,
+        )
+        header = f"Top matches for '{company_name}' ({source_label}):\n"
+        result = header + "\n".join(lines)
+        _cache_set(_SYMBOL_SEARCH_CACHE, cache_key, result)
+        return result
 
-    # ---------------------------------------
-    # Fallback: Alpha Vantage SYMBOL_SEARCH
-    # ---------------------------------------
+    # -------------------------------------------------------------
+    # No Alpha Vantage key: query Yahoo on this thread, no fallback
+    # -------------------------------------------------------------
     if not ALPHAVANTAGE_API_KEY:
+        outcome = _run_search("Yahoo Finance", _search_yahoo, company_name)
+        if isinstance(outcome, list) and outcome:
+            return _found(outcome, "Yahoo Finance")
+
         logger.warning(
             "ALPHAVANTAGE_API_KEY not set; cannot use Alpha Vantage fallback for symbol search"
         )
@@ -201,62 +446,63 @@ def search_stock_symbol(company_name: str) -> str:
             "the stock ticker symbol directly."
         )
 
-    try:
+    # -----------------------------------------------
+    # Yahoo Finance first, hedged with Alpha Vantage
+    # -----------------------------------------------
+    yahoo = _SEARCH_EXECUTOR.submit(_run_search, "Yahoo Finance", _search_yahoo, company_name)
+    futures = {yahoo: "Yahoo Finance"}
+
+    done, _ = wait(futures, timeout=_SEARCH_HEDGE_DELAY)
+    if done:
+        outcome = yahoo.result()
+        if isinstance(outcome, list) and outcome:
+            return _found(outcome, "Yahoo Finance")
+    else:
         logger.info(
-            f"Searching Alpha Vantage for ticker symbol, query='{company_name}'"
+            "Yahoo Finance search for '%s' is slow, also trying Alpha Vantage",
+            company_name,
         )
-        av_url = "https://www.alphavantage.co/query"
-        params = {
-            "function": "SYMBOL_SEARCH",
-            "keywords": company_name,
-            "apikey": ALPHAVANTAGE_API_KEY,
-        }
-        resp = requests.get(av_url, params=params, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-        logger.debug(f"Alpha Vantage raw search result: {data}")
-
-        matches = data.get("bestMatches", [])
-        if not matches:
-            logger.warning(f"Alpha Vantage returned no matches for '{company_name}'")
-            return (
-                f"Could not find a ticker symbol for '{company_name}' using Yahoo Finance or "
-                "Alpha Vantage. Please try a different or more specific company name."
-            )
-
-        lines = []
-        for m in matches[:5]:
-            symbol = m.get("1. symbol")
-            name = m.get("2. name") or symbol
-            region = m.get("4. region") or "N/A"
-            currency = m.get("8. currency") or "N/A"
-            if not symbol:
-                continue
-            lines.append(
-                f"{name} — {symbol} (Symbol: {symbol}, Region: {region}, Currency: {currency})"
-            )
-
-        if not lines:
-            logger.warning(
-                f"Alpha Vantage results for '{company_name}' contained no usable symbols"
-            )
-            return (
-                f"Alpha Vantage returned results for '{company_name}', but none had a usable "
-                "symbol. Please refine your query or provide the ticker directly."
-            )
+    futures[
+        _SEARCH_EXECUTOR.submit(_run_search, "Alpha Vantage", _search_alpha_vantage, company_name)
+    ] = "Alpha Vantage"
+
+    # Take the first source that returns usable matches
+    outcomes = {}
+    for future in as_completed(futures):
+        source = futures[future]
+        outcome = future.result()
+        if isinstance(outcome, list) and outcome:
+            for other in futures:
+                other.cancel()
+            return _found(outcome, source)
+        outcomes[source] = outcome
 
-        logger.info(
-            f"Found {len(lines)} ticker match(es) for '{company_name}' via Alpha Vantage"
+    # ---------------------------------------
+    # Neither source produced a usable match
+    # ---------------------------------------
+    errors = [
+        f"{source}: {outcome}"
+        for source, outcome in outcomes.items()
+        if isinstance(outcome, Exception)
+    ]
+    alpha_outcome = outcomes["Alpha Vantage"]
+    if isinstance(alpha_outcome, Exception):
+        return (
+            f"Error searching for ticker symbol for '{company_name}' using both Yahoo Finance "
+            f"and Alpha Vantage: {'; '.join(errors)}"
         )
-        return _format_lines(lines, "Alpha Vantage")
 
-    except Exception as e:
-        logger.error(f"Error calling Alpha Vantage: {e}", exc_info=True)
+    if alpha_outcome is None:
         return (
-            f"Error searching for ticker symbol for '{company_name}' using both Yahoo Finance "
-            f"and Alpha Vantage: {str(e)}"
+            f"Could not find a ticker symbol for '{company_name}' using Yahoo Finance or "
+            "Alpha Vantage. Please try a different or more specific company name."
         )
 
+    return (
+        f"Alpha Vantage returned results for '{company_name}', but none had a usable "
+        "symbol. Please refine your query or provide the ticker directly."
+    )
+
 
 # ============================================================================
 # TOOL REGISTRY
@@ -270,12 +516,17 @@ TOOL_REGISTRY = {
     "search_stock_symbol": search_stock_symbol,
 }
 
+# Exceptions tools are expected to raise for bad input or failed lookups
+# (network errors from requests are OSErrors). execute_tool reports these to
+# the model without a traceback; anything else is a bug and propagates.
+_EXPECTED_TOOL_ERRORS = (ValueError, LookupError, ArithmeticError, OSError)
+
 
 # ============================================================================
 # TOOL DEFINITIONS (SCHEMAS)
 # ============================================================================
 
-TOOL_DEFINITIONS = [
+_RAW_TOOL_DEFINITIONS = [
     {
         "type": "function",
         "function": {
@@ -347,48 +598,189 @@ TOOL_DEFINITIONS = [
 ]
 
 
+# The definitions are static, so they are JSON-encoded once at import and the
+# bytes are spliced directly into every chat request. The public definitions
+# are a tuple of read-only mapping views, so they can be shared with callers
+# without copying. (orjson cannot encode mappingproxy, hence the raw list.)
+TOOL_DEFINITIONS_BYTES = orjson.dumps(_RAW_TOOL_DEFINITIONS)
+TOOL_DEFINITIONS = tuple(MappingProxyType(definition) for definition in _RAW_TOOL_DEFINITIONS)
+
+
+# Python types accepted for each JSON-schema type used in tool parameters.
+# bool is a subclass of int, so validators reject it explicitly unless the
+# schema asks for a boolean.
+_JSON_SCHEMA_TYPES = {
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+    "object": dict,
+    "array": list,
+}
+
+
+def _compile_validator(parameters: dict):
+    """
+    Build an argument checker for one tool from its JSON-schema parameters.
+    The schema is read once here; the returned function only does set and
+    isinstance checks and raises TypeError describing the first problem.
+    """
+    required = frozenset(parameters.get("required", ()))
+    expected_types = {
+        name: _JSON_SCHEMA_TYPES[prop["type"]]
+        for name, prop in parameters.get("properties", {}).items()
+    }
+    
+    def validate(tool_args: dict):
+        if not isinstance(tool_args, dict):
+            raise TypeError("arguments must be an object")
+        missing = required.difference(tool_args)
+        if missing:
+            raise TypeError(f"missing required argument(s): {', '.join(sorted(missing))}")
+        for name, value in tool_args.items():
+            expected = expected_types.get(name)
+            if expected is None:
+                raise TypeError(f"unexpected argument: {name!r}")
+            if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+                raise TypeError(f"argument {name!r} has wrong type {type(value).__name__}")
+    
+    return validate
+
+
+# Dispatch table used by execute_tool: each tool's function together with a
+# validator compiled from its schema, so arguments are checked before the
+# call instead of catching TypeErrors raised by the call itself.
+_TOOL_DISPATCH = {
+    definition["function"]["name"]: (
+        TOOL_REGISTRY[definition["function"]["name"]],
+        _compile_validator(definition["function"]["parameters"]),
+    )
+    for definition in TOOL_DEFINITIONS
+}
+
+
 # ============================================================================
 # TOOL EXECUTION
 # ============================================================================
 
+# execute_tool runs for every tool call, so it uses bound logger methods and
+# checks a cached flag before debug logging. Call refresh_log_cache() after
+# changing logging configuration so the flag picks up the new level.
+_log_debug = logger.debug
+_log_error = logger.error
+_DEBUG_ON = logger.isEnabledFor(logging.DEBUG)
+
+
+def refresh_log_cache() -> None:
+    """Re-read whether debug logging is enabled for execute_tool."""
+    global _DEBUG_ON
+    _DEBUG_ON = logger.isEnabledFor(logging.DEBUG)
+
+
+@lru_cache(maxsize=512)
+def _parse_tool_args(raw_args: str) -> dict:
+    """
+    Decode tool arguments that arrive as a JSON string (OpenAI-style).
+    Results are shared between calls, so callers must not mutate them.
+    """
+    try:
+        tool_args = orjson.loads(raw_args)
+    except orjson.JSONDecodeError as e:
+        raise TypeError(f"arguments are not valid JSON: {e}") from e
+    if not isinstance(tool_args, dict):
+        raise TypeError("arguments must be a JSON object")
+    return tool_args
+
+
+@lru_cache(maxsize=256)
+def _unknown_tool_error(tool_name: str) -> dict:
+    """
+    Build the error result for an unknown tool name.
+    Results are shared between calls, so callers must not mutate them.
+    """
+    return {"error": f"Unknown tool: {tool_name}"}
+
+
 def execute_tool(tool_name: str, tool_args: dict):
     """
     Execute a tool by name with the given arguments.
     
     Args:
-        tool_name: The name of the tool to execute
-        tool_args: Dictionary of arguments for the tool
+        tool_name: The name of the tool to execute. Callers parsing it from
+            a request should sys.intern() it once, since the registry keys
+            are interned string literals
+        tool_args: Dictionary of arguments for the tool, or the same
+            arguments encoded as a JSON string
     
     Returns:
-        The result of the tool execution
+        The result of the tool execution, or an error dict for unknown tools,
+        invalid arguments and expected tool errors. Error dicts for unknown
+        tools are shared and must be treated as read-only
+    
+    Raises:
+        Any unexpected exception raised by the tool itself
     """
-    if tool_name not in TOOL_REGISTRY:
-        logger.error(f"Unknown tool requested: {tool_name}")
-        return {"error": f"Unknown tool: {tool_name}"}
+    # Get the function and its argument validator from the registry
+    entry = _TOOL_DISPATCH.get(tool_name)
+    if entry is None:
+        _log_error("Unknown tool requested: %s", tool_name)
+        return _unknown_tool_error(tool_name)
+    tool_function, validate = entry
+    
+    # Validate the arguments against the tool's schema before calling, so a
+    # TypeError raised inside the tool is not reported as bad arguments
+    try:
+        if isinstance(tool_args, str):
+            tool_args = _parse_tool_args(tool_args)
+        validate(tool_args)
+    except TypeError as e:
+        _log_error("Invalid arguments for %s: %s", tool_name, e)
+        return {"error": f"Invalid arguments for {tool_name}: {e}"}
     
     try:
-        # Get the function from the registry
-        tool_function = TOOL_REGISTRY[tool_name]
-        logger.debug(f"Executing tool: {tool_name} with args: {tool_args}")
+        if _DEBUG_ON:
+            _log_debug("Executing tool: %s with args: %s", tool_name, tool_args)
         
-        # Call the function with unpacked arguments
+        # Call the function with the validated arguments
         result = tool_function(**tool_args)
-        logger.debug(f"Tool {tool_name} returned: {result}")
+        if _DEBUG_ON:
+            _log_debug("Tool %s returned: %s", tool_name, result)
         return result
-    except TypeError as e:
-        logger.error(f"Invalid arguments for {tool_name}: {e}")
-        return {"error": f"Invalid arguments for {tool_name}: {str(e)}"}
-    except Exception as e:
-        logger.error(f"Error executing {tool_name}: {e}", exc_info=True)
-        return {"error": f"Error executing {tool_name}: {str(e)}"}
+    except _EXPECTED_TOOL_ERRORS as e:
+        _log_error("Error executing %s: %s", tool_name, e)
+        return {"error": f"Error executing {tool_name}: {e}"}
 
 
 def get_available_tools():
     """
-    Get the list of available tool definitions.
+    Get the available tool definitions.
+    
+    The definitions are mappingproxy views, which json and orjson cannot
+    serialize. Use get_available_tools_bytes() to send them, or
+    get_available_tools_dicts() to pass plain dicts to a client library.
     
     Returns:
-        List of tool definitions in Ollama/OpenAI format
+        Tuple of read-only tool definitions in Ollama/OpenAI format
     """
     return TOOL_DEFINITIONS
 
+
+def get_available_tools_dicts() -> list:
+    """
+    Get the available tool definitions as plain, JSON-serializable data.
+    
+    Returns:
+        A new list of tool definition dicts that the caller may modify
+    """
+    return orjson.loads(TOOL_DEFINITIONS_BYTES)
+
+
+def get_available_tools_bytes() -> bytes:
+    """
+    Get the available tool definitions as pre-encoded JSON.
+    
+    Returns:
+        JSON bytes of the tool definitions list, suitable for splicing into
+        an Ollama request body
+    """
+    return TOOL_DEFINITIONS_BYTES